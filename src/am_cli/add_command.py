@@ -5,30 +5,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from . import module_helpers
-from .sync_helpers import load_mappings, refresh_agents_files, write_mappings
-
-
-def _find_project_root(start: Path) -> Path:
-    for candidate in [start, *start.parents]:
-        if (candidate / ".git").exists():
-            return candidate
-    return start
-
-
-def _normalize_local_path(raw_path: str, project_root: Path) -> str:
-    normalized_path = Path(raw_path)
-    if not normalized_path.is_absolute():
-        normalized_path = (project_root / normalized_path).resolve()
-
-    try:
-        relative_path = normalized_path.relative_to(project_root.resolve())
-    except ValueError as exc:
-        raise ValueError(
-            f"Path '{raw_path}' must be within the project root '{project_root}'."
-        ) from exc
-
-    return "." if str(relative_path) == "." else relative_path.as_posix()
+from .path_helpers import find_project_root, normalize_local_path
 
 
 def register_add_command(subparsers: argparse._SubParsersAction) -> None:
@@ -58,24 +35,47 @@ def register_add_command(subparsers: argparse._SubParsersAction) -> None:
 
 
 def run_add_command(args: argparse.Namespace) -> int:
-    project_root = _find_project_root(Path.cwd())
+    # Deferred so `am --help` and other commands skip the network/YAML imports.
+    from . import module_helpers
+    from .sync_helpers import (
+        MdEntry,
+        append_mapping,
+        load_mappings,
+        refresh_agents_files,
+        write_mappings,
+    )
+
+    project_root = find_project_root(Path.cwd())
     config_path = project_root / "am.yml"
 
     try:
         mappings = load_mappings(config_path)
-        local_path_key = _normalize_local_path(args.path, project_root)
+        local_path_key = normalize_local_path(args.path, project_root)
         path_mds = mappings.setdefault(local_path_key, [])
         github_slug = args.github_path.strip()
-        existing_md = next(
-            (md_entry for md_entry in path_mds if md_entry["name"] == github_slug), None
+        existing_index = next(
+            (
+                index
+                for index, md_entry in enumerate(path_mds)
+                if md_entry.name == github_slug
+            ),
+            None,
         )
-        if existing_md is None:
-            path_mds.append({"name": github_slug, "module": bool(args.module)})
-        elif args.module:
-            existing_md["module"] = True
-        write_mappings(config_path, mappings)
-        refreshed_paths = refresh_agents_files(
-            project_root=project_root, mappings=mappings
+        changed_md = None
+        if existing_index is None:
+            changed_md = MdEntry(github_slug, bool(args.module))
+            path_mds.append(changed_md)
+        elif args.module and not path_mds[existing_index].module:
+            changed_md = path_mds[existing_index]._replace(module=True)
+            path_mds[existing_index] = changed_md
+        config_changed = changed_md is not None
+        if config_changed and not append_mapping(config_path, local_path_key, changed_md):
+            config_changed = write_mappings(config_path, mappings)
+        # Re-adding an existing entry leaves the composed AGENTS.md files as they are.
+        refreshed_paths = (
+            refresh_agents_files(project_root=project_root, mappings=mappings)
+            if config_changed
+            else []
         )
         downloaded_files = 0
         if args.module:
@@ -88,12 +88,12 @@ def run_add_command(args: argparse.Namespace) -> int:
         print(str(exc))
         return 1
 
-    print(f"Added {config_path} at path {local_path_key!r}")
+    if config_changed:
+        print(f"Added {config_path} at path {local_path_key!r}")
+    else:
+        print(f"{github_slug!r} is already in {config_path} at path {local_path_key!r}")
     if args.module:
-        print(
-            f"Downloaded {downloaded_files} module file(s) to "
-            f"{(project_root / local_path_key / '.am').resolve()}"
-        )
+        print(f"Downloaded {downloaded_files} module file(s) to {target_dir / '.am'}")
     for refreshed in refreshed_paths:
         print(f"Refreshed {refreshed}")
     return 0
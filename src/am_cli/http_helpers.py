@@ -0,0 +1,134 @@
+"""Helpers for issuing HTTP requests over pooled keep-alive connections."""
+
+from __future__ import annotations
+
+import base64
+import http.client
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.error import HTTPError, URLError
+from urllib.parse import unquote, urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+USER_AGENT = "am-cli/0.1"
+# Shared by every request without extra headers; http.client never mutates it.
+_DEFAULT_HEADERS = {"User-Agent": USER_AGENT}
+GITHUB_API_HEADERS = {"Accept": "application/vnd.github+json"}
+
+_MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+# Connections are not thread-safe, so each thread keeps its own pool keyed by
+# (scheme, netloc). Worker threads reuse theirs across every task they run.
+_local = threading.local()
+
+
+def _connections() -> dict[tuple[str, str], http.client.HTTPConnection]:
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = {}
+        _local.connections = connections
+    return connections
+
+
+def _new_connection(
+    scheme: str, netloc: str, timeout: float
+) -> http.client.HTTPConnection:
+    connection_class = (
+        http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+    )
+    target = urlsplit(f"{scheme}://{netloc}")
+    proxy = getproxies().get(scheme)
+    if not proxy or proxy_bypass(target.hostname or ""):
+        return connection_class(netloc, timeout=timeout)
+
+    proxy_parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    connection = connection_class(
+        proxy_parts.hostname or "", proxy_parts.port, timeout=timeout
+    )
+    tunnel_headers: dict[str, str] = {}
+    if proxy_parts.username:
+        credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+        token = base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+        tunnel_headers["Proxy-Authorization"] = f"Basic {token}"
+    connection.set_tunnel(target.hostname or "", target.port, headers=tunnel_headers)
+    return connection
+
+
+def _discard_connection(key: tuple[str, str]) -> None:
+    connection = _connections().pop(key, None)
+    if connection is not None:
+        connection.close()
+
+
+def _send(
+    url: str, headers: dict[str, str], timeout: float
+) -> tuple[tuple[str, str], http.client.HTTPResponse]:
+    parts = urlsplit(url)
+    if parts.scheme not in {"http", "https"}:
+        raise URLError(f"Unsupported URL scheme in {url}")
+
+    key = (parts.scheme, parts.netloc)
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+
+    while True:
+        connections = _connections()
+        connection = connections.get(key)
+        if connection is None:
+            connection = _new_connection(parts.scheme, parts.netloc, timeout)
+            connections[key] = connection
+        reused = connection.sock is not None
+
+        try:
+            connection.request("GET", target, headers=headers)
+            return key, connection.getresponse()
+        except (http.client.HTTPException, OSError) as exc:
+            _discard_connection(key)
+            # Servers drop idle keep-alive connections; retry those once on a
+            # fresh socket, but surface failures of brand new connections.
+            if not reused or isinstance(exc, TimeoutError):
+                raise URLError(exc) from exc
+
+
+@contextmanager
+def open_url(
+    url: str, headers: dict[str, str] | None = None, timeout: float = 20
+) -> Iterator[http.client.HTTPResponse]:
+    """
+    Issue a GET request for `url`, following redirects, and yield the response.
+
+    Error statuses raise `HTTPError` and connection failures raise `URLError`,
+    matching `urllib.request.urlopen`. `304 Not Modified` is yielded as-is.
+    """
+    request_headers = {**_DEFAULT_HEADERS, **headers} if headers else _DEFAULT_HEADERS
+    for _ in range(_MAX_REDIRECTS + 1):
+        key, response = _send(url, request_headers, timeout)
+        if response.status in _REDIRECT_STATUSES:
+            location = response.getheader("Location")
+            response.read()
+            if not location:
+                raise HTTPError(url, response.status, response.reason, response.headers, None)
+            url = urljoin(url, location)
+            continue
+
+        if response.status >= 400:
+            response.close()
+            _discard_connection(key)
+            raise HTTPError(url, response.status, response.reason, response.headers, None)
+
+        if response.length == 0:
+            # Drain empty bodies (e.g. 304) so the connection returns to the pool.
+            response.read()
+        try:
+            yield response
+        finally:
+            if not response.isclosed():
+                # An unread body would desync the next request on this connection.
+                response.close()
+                _discard_connection(key)
+        return
+
+    raise URLError(f"Too many redirects fetching {url}")
@@ -3,21 +3,23 @@
 from __future__ import annotations
 
 import argparse
+import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .sync_helpers import MdEntry, write_mappings
+from .path_helpers import find_project_root, normalize_local_path
 
+if TYPE_CHECKING:
+    from .sync_helpers import MdEntry
 
-def _find_project_root(start: Path) -> Path:
-    for candidate in [start, *start.parents]:
-        if (candidate / ".git").exists():
-            return candidate
-    return start
+_SKIPPED_SCAN_DIRS = frozenset({".am", ".git", ".venv", "node_modules"})
 
 
 def _parse_mapping_entries(
     entries: list[str], project_root: Path
 ) -> dict[str, list[MdEntry]]:
+    from .sync_helpers import MdEntry
+
     mappings: dict[str, list[MdEntry]] = {}
 
     for entry in entries:
@@ -36,21 +38,10 @@ def _parse_mapping_entries(
                 f"Invalid mapping '{entry}'. GitHub URL slug cannot be empty."
             )
 
-        normalized_path = Path(path)
-        if not normalized_path.is_absolute():
-            normalized_path = (project_root / normalized_path).resolve()
-
-        try:
-            relative_path = normalized_path.relative_to(project_root.resolve())
-        except ValueError as exc:
-            raise ValueError(
-                f"Path '{path}' must be within the project root '{project_root}'."
-            ) from exc
-
-        key = "." if str(relative_path) == "." else relative_path.as_posix()
+        key = normalize_local_path(path, project_root)
         mapping_mds = mappings.setdefault(key, [])
-        if not any(md_entry["name"] == slug for md_entry in mapping_mds):
-            mapping_mds.append({"name": slug, "module": False})
+        if not any(md_entry.name == slug for md_entry in mapping_mds):
+            mapping_mds.append(MdEntry(slug, False))
 
     return mappings
 
@@ -58,9 +49,10 @@ def _parse_mapping_entries(
 def _ensure_gitignore_rule(project_root: Path, rule: str) -> None:
     gitignore_path = project_root / ".gitignore"
 
-    existing_lines: list[str] = []
-    if gitignore_path.exists():
+    try:
         existing_lines = gitignore_path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        existing_lines = []
 
     if rule in existing_lines:
         return
@@ -69,19 +61,29 @@ def _ensure_gitignore_rule(project_root: Path, rule: str) -> None:
     gitignore_path.write_text("\n".join(existing_lines) + "\n", encoding="utf-8")
 
 
-def _find_agents_files(project_root: Path) -> list[Path]:
-    return [
-        p
-        for p in project_root.rglob("AGENTS.md")
-        if ".git" not in p.parts and p.is_file()
-    ]
-
-
-def _move_agents_files(agents_paths: list[Path]) -> int:
+def _find_agents_files(project_root: Path) -> list[str]:
+    agents_paths: list[str] = []
+    pending_dirs = [str(project_root)]
+    while pending_dirs:
+        try:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    # DirEntry caches its type, so these checks rarely stat.
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIPPED_SCAN_DIRS:
+                            pending_dirs.append(entry.path)
+                    elif entry.name == "AGENTS.md" and entry.is_file():
+                        agents_paths.append(entry.path)
+        except OSError:
+            continue
+    return agents_paths
+
+
+def _move_agents_files(agents_paths: list[str]) -> int:
     moved_count = 0
     for agents_path in agents_paths:
-        local_path = agents_path.with_name("AGENTS.local.md")
-        agents_path.replace(local_path)
+        local_path = agents_path[: -len("AGENTS.md")] + "AGENTS.local.md"
+        os.replace(agents_path, local_path)
         moved_count += 1
     return moved_count
 
@@ -115,7 +117,9 @@ def register_init_command(subparsers: argparse._SubParsersAction) -> None:
 
 
 def run_init_command(args: argparse.Namespace) -> int:
-    project_root = _find_project_root(Path.cwd())
+    from .sync_helpers import write_mappings
+
+    project_root = find_project_root(Path.cwd())
     config_path = project_root / "am.yml"
     if config_path.exists():
         print(f"Skipped creating existing file: {config_path}")
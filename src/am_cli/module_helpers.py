@@ -3,12 +3,59 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import shutil
+import tarfile
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from http.client import HTTPException
 from pathlib import Path
-from urllib.error import HTTPError, URLError
+from typing import BinaryIO, NamedTuple, Tuple
 from urllib.parse import quote
-from urllib.request import Request, urlopen
+
+from .http_helpers import GITHUB_API_HEADERS, open_url
+
+_MAX_WORKERS = 16
+# The tarball holds the whole repository, so it is never used for large ones,
+# and otherwise only when the modules need most of it (see `_use_tarball`).
+_TARBALL_MAX_BYTES = 16 * 1024 * 1024
+# Roughly what one extra request costs in latency, expressed as bytes transferred.
+_REQUEST_COST_BYTES = 128 * 1024
+_COPY_CHUNK_BYTES = 64 * 1024
+# `.am/.cache` holds am's own bookkeeping; everything else under `.am` is module files.
+_CACHE_DIR_NAME = ".cache"
+_ETAGS_FILE_NAME = "module-etags.json"
+_SLUG_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+# ETags are recorded per (URL, destination): a 304 only vouches for the files
+# that URL last populated, and one tarball URL feeds every module in its repo.
+_EtagKey = Tuple[str, str]
+# A module file's (size, mtime_ns) right after am wrote it.
+_FileStamp = Tuple[int, int]
+
+
+class _ModuleCache(NamedTuple):
+    etags: dict[_EtagKey, str]
+    # Keyed by each file's path relative to `.am`. A file whose stamp no longer
+    # matches was changed outside am, so ETags can't vouch for it.
+    stamps: dict[str, _FileStamp]
+
+
+class _ModulePlan(NamedTuple):
+    # The module's directory under `.am`.
+    destination: Path
+    # Maps each file's path in the repo to its download URL and local destination.
+    files: dict[str, tuple[str, Path]]
+
+
+class _RepoPlan(NamedTuple):
+    owner: str
+    repo: str
+    # Blob sizes from the repo tree, or None when the tree came back truncated.
+    blob_sizes: dict[str, int] | None
+    modules: list[_ModulePlan]
 
 
 def _parse_github_path(github_path: str) -> tuple[str, str, list[str]]:
@@ -28,93 +75,512 @@ def _github_contents_api_url(owner: str, repo: str, path_in_repo: str) -> str:
     return f"https://api.github.com/repos/{owner}/{repo}/contents?ref=main"
 
 
+def _github_tree_api_url(owner: str, repo: str, ref: str) -> str:
+    encoded_ref = quote(ref, safe="")
+    return f"https://api.github.com/repos/{owner}/{repo}/git/trees/{encoded_ref}?recursive=1"
+
+
+def _github_raw_url(owner: str, repo: str, ref: str, path_in_repo: str) -> str:
+    encoded_path = quote(path_in_repo, safe="/")
+    return f"https://raw.githubusercontent.com/{owner}/{repo}/{ref}/{encoded_path}"
+
+
+def _github_tarball_url(owner: str, repo: str, ref: str) -> str:
+    encoded_ref = quote(ref, safe="")
+    return f"https://api.github.com/repos/{owner}/{repo}/tarball/{encoded_ref}"
+
+
 def _module_slug_directory_name(github_path: str) -> str:
     cleaned = github_path.strip().strip("/")
     if not cleaned:
         raise ValueError("GitHub path cannot be empty.")
-    return re.sub(r"[^A-Za-z0-9._-]+", "_", cleaned)
+    return _SLUG_UNSAFE_CHARS.sub("_", cleaned)
 
 
 def _fetch_json(url: str) -> object:
-    request = Request(
-        url,
-        headers={
-            "User-Agent": "am-cli/0.1",
-            "Accept": "application/vnd.github+json",
-        },
-    )
     try:
-        with urlopen(request, timeout=20) as response:  # nosec B310
+        with open_url(url, headers=GITHUB_API_HEADERS) as response:
             return json.loads(response.read().decode("utf-8"))
-    except (HTTPError, URLError, TimeoutError, json.JSONDecodeError) as exc:
+    except (HTTPException, OSError, json.JSONDecodeError) as exc:
         raise ValueError(
             f"Failed to fetch GitHub metadata from {url}. Error: {exc}"
         ) from exc
 
 
-def _download_bytes(url: str) -> bytes:
-    request = Request(url, headers={"User-Agent": "am-cli/0.1"})
+def _etags_path(modules_root: Path) -> Path:
+    return modules_root / _CACHE_DIR_NAME / _ETAGS_FILE_NAME
+
+
+def _destination_key(modules_root: Path, destination: Path) -> str:
+    return destination.relative_to(modules_root).as_posix()
+
+
+def _load_cache(modules_root: Path) -> _ModuleCache:
+    """
+    Load the cache stored as
+    `{"etags": {url: {destination: etag}}, "files": {path: [size, mtime_ns]}}`.
+    """
+    cache = _ModuleCache(etags={}, stamps={})
     try:
-        with urlopen(request, timeout=20) as response:  # nosec B310
-            return response.read()
-    except (HTTPError, URLError, TimeoutError) as exc:
+        payload = json.loads(_etags_path(modules_root).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return cache
+    if not isinstance(payload, dict):
+        return cache
+    etags_payload = payload.get("etags")
+    if isinstance(etags_payload, dict):
+        cache.etags.update(
+            ((url, destination), etag)
+            for url, destinations in etags_payload.items()
+            if isinstance(url, str) and isinstance(destinations, dict)
+            for destination, etag in destinations.items()
+            if isinstance(destination, str) and isinstance(etag, str)
+        )
+    files_payload = payload.get("files")
+    if isinstance(files_payload, dict):
+        cache.stamps.update(
+            (path, (stamp[0], stamp[1]))
+            for path, stamp in files_payload.items()
+            if isinstance(stamp, list)
+            and len(stamp) == 2
+            and all(type(value) is int for value in stamp)
+        )
+    return cache
+
+
+def _write_cache(modules_root: Path, cache: _ModuleCache) -> None:
+    etags_payload: dict[str, dict[str, str]] = {}
+    for (url, destination), etag in cache.etags.items():
+        etags_payload.setdefault(url, {})[destination] = etag
+    payload = {
+        "etags": etags_payload,
+        "files": {path: list(stamp) for path, stamp in cache.stamps.items()},
+    }
+    etags_path = _etags_path(modules_root)
+    etags_path.parent.mkdir(parents=True, exist_ok=True)
+    etags_path.write_text(
+        json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+
+
+def _file_stamp(path: Path) -> _FileStamp | None:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return None
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _conditional_headers(
+    keys: list[_EtagKey],
+    destination_paths: list[Path],
+    modules_root: Path,
+    known: _ModuleCache,
+) -> dict[str, str]:
+    # A 304 can only be trusted if every destination was last filled from the
+    # same version and each of its files is still exactly as am wrote it.
+    etags = {known.etags.get(key) for key in keys}
+    if len(etags) != 1:
+        return {}
+    etag = etags.pop()
+    if not etag:
+        return {}
+    for path in destination_paths:
+        stamp = known.stamps.get(_destination_key(modules_root, path))
+        if stamp is None or _file_stamp(path) != stamp:
+            return {}
+    return {"If-None-Match": etag}
+
+
+def _keep_cached(
+    keys: list[_EtagKey],
+    destination_paths: list[Path],
+    modules_root: Path,
+    known: _ModuleCache,
+    fetched: _ModuleCache,
+) -> None:
+    """Carry the cache entries a 304 just confirmed over to `fetched`."""
+    for key in keys:
+        fetched.etags[key] = known.etags[key]
+    for path in destination_paths:
+        path_key = _destination_key(modules_root, path)
+        fetched.stamps[path_key] = known.stamps[path_key]
+
+
+def _forget(
+    keys: list[_EtagKey],
+    destination_paths: list[Path],
+    modules_root: Path,
+    fetched: _ModuleCache,
+) -> None:
+    """Drop entries for files about to be rewritten, until they are complete."""
+    for key in keys:
+        fetched.etags.pop(key, None)
+    for path in destination_paths:
+        fetched.stamps.pop(_destination_key(modules_root, path), None)
+
+
+def _record_file(destination_path: Path, modules_root: Path, fetched: _ModuleCache) -> None:
+    stamp = _file_stamp(destination_path)
+    if stamp is not None:
+        fetched.stamps[_destination_key(modules_root, destination_path)] = stamp
+
+
+def _record_etag(key: _EtagKey, etag: str | None, fetched: _ModuleCache) -> None:
+    if etag:
+        fetched.etags[key] = etag
+
+
+def _write_file(source: BinaryIO, destination_path: Path) -> None:
+    """Copy `source` to `destination_path`, replacing it only once complete."""
+    # A download that fails partway must not leave a truncated module file.
+    partial_path = destination_path.with_name(f".{destination_path.name}.part")
+    try:
+        with partial_path.open("wb") as output:
+            shutil.copyfileobj(source, output, _COPY_CHUNK_BYTES)
+        os.replace(partial_path, destination_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+
+
+def _download_to_file(
+    url: str,
+    destination_path: Path,
+    modules_root: Path,
+    known: _ModuleCache,
+    fetched: _ModuleCache,
+) -> None:
+    keys = [(url, _destination_key(modules_root, destination_path))]
+    headers = _conditional_headers(keys, [destination_path], modules_root, known)
+    try:
+        with open_url(url, headers=headers) as response:
+            if response.status == 304:
+                _keep_cached(keys, [destination_path], modules_root, known, fetched)
+                return
+            _forget(keys, [destination_path], modules_root, fetched)
+            _write_file(response, destination_path)
+            _record_file(destination_path, modules_root, fetched)
+            _record_etag(keys[0], response.getheader("ETag"), fetched)
+    # OSError also covers HTTPError, URLError, timeouts and dropped connections.
+    except (HTTPException, OSError) as exc:
         raise ValueError(f"Failed to download file from {url}. Error: {exc}") from exc
 
 
-def download_github_module(github_path: str, destination_root: Path) -> int:
-    """Download all files at `github_path` into `<destination_root>/.am/...`."""
+def _fetch_tree(owner: str, repo: str, ref: str = "main") -> dict:
+    url = _github_tree_api_url(owner=owner, repo=repo, ref=ref)
+    payload = _fetch_json(url)
+    if not isinstance(payload, dict) or not isinstance(payload.get("tree"), list):
+        raise ValueError(f"Unexpected GitHub tree response from {url}.")
+    return payload
+
+
+def _tree_module_files(
+    tree: dict, owner: str, repo: str, root_prefix: str, ref: str = "main"
+) -> list[tuple[str, str]]:
+    module_files: list[tuple[str, str]] = []
+    for entry in tree["tree"]:
+        if not isinstance(entry, dict) or entry.get("type") != "blob":
+            continue
+
+        entry_path = entry.get("path")
+        if not isinstance(entry_path, str):
+            continue
+        if root_prefix and not (
+            entry_path == root_prefix or entry_path.startswith(f"{root_prefix}/")
+        ):
+            continue
+
+        download_url = _github_raw_url(
+            owner=owner, repo=repo, ref=ref, path_in_repo=entry_path
+        )
+        module_files.append((entry_path, download_url))
+    return module_files
+
+
+def _tree_blob_sizes(tree: dict) -> dict[str, int]:
+    return {
+        entry["path"]: entry["size"]
+        for entry in tree["tree"]
+        if isinstance(entry, dict)
+        and entry.get("type") == "blob"
+        and isinstance(entry.get("path"), str)
+        and isinstance(entry.get("size"), int)
+    }
+
+
+def _download_repo_tarball(
+    repo_plan: _RepoPlan,
+    modules_root: Path,
+    known: _ModuleCache,
+    fetched: _ModuleCache,
+    ref: str = "main",
+) -> int:
+    """Fill every module planned from one repository with a single tarball."""
+    url = _github_tarball_url(owner=repo_plan.owner, repo=repo_plan.repo, ref=ref)
+    keys = [
+        (url, _destination_key(modules_root, module.destination))
+        for module in repo_plan.modules
+    ]
+    # Overlapping modules can place the same repo file in several destinations.
+    destinations: dict[str, list[Path]] = {}
+    for module in repo_plan.modules:
+        for entry_path, (_, destination_path) in module.files.items():
+            destinations.setdefault(entry_path, []).append(destination_path)
+    destination_paths = [path for paths in destinations.values() for path in paths]
+
+    headers = _conditional_headers(keys, destination_paths, modules_root, known)
+    file_count = 0
+    try:
+        with open_url(url, headers=headers) as response:
+            if response.status == 304:
+                _keep_cached(keys, destination_paths, modules_root, known, fetched)
+                return len(destination_paths)
+            _forget(keys, destination_paths, modules_root, fetched)
+            etag = response.getheader("ETag")
+            with tarfile.open(fileobj=response, mode="r|gz") as archive:
+                for member in archive:
+                    if not member.isfile():
+                        continue
+
+                    # Members are nested under a single `<owner>-<repo>-<sha>/` directory.
+                    _, _, path_in_repo = member.name.partition("/")
+                    member_destinations = destinations.get(path_in_repo)
+                    if not member_destinations:
+                        continue
+
+                    member_file = archive.extractfile(member)
+                    if member_file is None:
+                        continue
+                    # The archive stream can't be rewound, so further copies
+                    # are made from the first extracted file.
+                    first_path, *other_paths = member_destinations
+                    _write_file(member_file, first_path)
+                    _record_file(first_path, modules_root, fetched)
+                    for other_path in other_paths:
+                        with first_path.open("rb") as first_file:
+                            _write_file(first_file, other_path)
+                        _record_file(other_path, modules_root, fetched)
+                    file_count += len(member_destinations)
+    except (HTTPException, OSError, tarfile.TarError) as exc:
+        raise ValueError(f"Failed to download archive from {url}. Error: {exc}") from exc
+    # Record ETags only once every destination has been written.
+    for key in keys:
+        _record_etag(key, etag, fetched)
+    return file_count
+
+
+def _list_directory(owner: str, repo: str, path_in_repo: str) -> list[dict]:
+    payload = _fetch_json(
+        _github_contents_api_url(owner=owner, repo=repo, path_in_repo=path_in_repo)
+    )
+    entries = payload if isinstance(payload, list) else [payload]
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def _collect_module_files(
+    owner: str, repo: str, root_prefix: str, executor: ThreadPoolExecutor
+) -> list[tuple[str, str]]:
+    """Walk the contents API, listing discovered directories concurrently."""
+    module_files: list[tuple[str, str]] = []
+    pending: set[Future[list[dict]]] = {
+        executor.submit(_list_directory, owner, repo, root_prefix)
+    }
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            for entry in future.result():
+                entry_type = entry.get("type")
+                entry_path = entry.get("path")
+                if not isinstance(entry_path, str):
+                    continue
+
+                if entry_type == "dir":
+                    pending.add(executor.submit(_list_directory, owner, repo, entry_path))
+                    continue
+
+                if entry_type != "file":
+                    continue
+
+                download_url = entry.get("download_url")
+                if not isinstance(download_url, str) or not download_url:
+                    continue
+                module_files.append((entry_path, download_url))
+
+    return module_files
+
+
+def _relative_module_path(entry_path: str, root_prefix: str) -> str:
+    if not root_prefix:
+        return entry_path
+    if entry_path.startswith(root_prefix):
+        return entry_path.removeprefix(root_prefix).lstrip("/")
+    return Path(entry_path).name
+
+
+def _plan_module(
+    github_path: str,
+    destination_root: Path,
+    tree: dict,
+    executor: ThreadPoolExecutor,
+) -> _ModulePlan:
     owner, repo, repo_path_parts = _parse_github_path(github_path)
     module_path_in_repo = "/".join(repo_path_parts)
     module_slug = _module_slug_directory_name(github_path)
     module_destination = destination_root / ".am" / module_slug
 
     root_prefix = module_path_in_repo.strip("/")
-    pending_paths = [root_prefix]
-    file_count = 0
+    if tree.get("truncated"):
+        # Trees past GitHub's entry cap come back partial; walk the contents API.
+        module_files = _collect_module_files(owner, repo, root_prefix, executor)
+    else:
+        module_files = _tree_module_files(tree, owner, repo, root_prefix)
+    if not module_files:
+        raise ValueError(f"No files found at GitHub path '{github_path}'.")
 
-    while pending_paths:
-        current_path = pending_paths.pop()
-        payload = _fetch_json(
-            _github_contents_api_url(owner=owner, repo=repo, path_in_repo=current_path)
+    files = {
+        entry_path: (
+            download_url,
+            module_destination / Path(_relative_module_path(entry_path, root_prefix)),
         )
-        entries = payload if isinstance(payload, list) else [payload]
+        for entry_path, download_url in module_files
+    }
+    return _ModulePlan(destination=module_destination, files=files)
+
+
+def _plan_repos(
+    github_paths: list[str], destination_root: Path, executor: ThreadPoolExecutor
+) -> list[_RepoPlan]:
+    """Plan each module, fetching every repository's tree only once."""
+    paths_by_repo: dict[tuple[str, str], list[str]] = {}
+    for github_path in github_paths:
+        owner, repo, _ = _parse_github_path(github_path)
+        paths_by_repo.setdefault((owner, repo), []).append(github_path)
 
-        for entry in entries:
-            if not isinstance(entry, dict):
-                continue
+    repos = list(paths_by_repo)
+    trees = executor.map(lambda owner_repo: _fetch_tree(*owner_repo), repos)
+    repo_plans: list[_RepoPlan] = []
+    for (owner, repo), tree in zip(repos, trees):
+        modules = [
+            _plan_module(github_path, destination_root, tree, executor)
+            for github_path in paths_by_repo[(owner, repo)]
+        ]
+        blob_sizes = None if tree.get("truncated") else _tree_blob_sizes(tree)
+        repo_plans.append(
+            _RepoPlan(owner=owner, repo=repo, blob_sizes=blob_sizes, modules=modules)
+        )
+    return repo_plans
 
-            entry_type = entry.get("type")
-            entry_path = entry.get("path")
-            if not isinstance(entry_path, str):
-                continue
 
-            if entry_type == "dir":
-                pending_paths.append(entry_path)
-                continue
+def _use_tarball(repo_plan: _RepoPlan) -> bool:
+    if repo_plan.blob_sizes is None:
+        return False
+    wanted_paths = {
+        entry_path for module in repo_plan.modules for entry_path in module.files
+    }
+    if len(wanted_paths) < 2:
+        return False
+    repo_bytes = sum(repo_plan.blob_sizes.values())
+    if repo_bytes > _TARBALL_MAX_BYTES:
+        return False
+    # The archive carries the whole repository; it wins when the unwanted
+    # bytes cost less than the round trips the per-file requests would take.
+    wanted_bytes = sum(repo_plan.blob_sizes.get(path, 0) for path in wanted_paths)
+    return repo_bytes - wanted_bytes <= len(wanted_paths) * _REQUEST_COST_BYTES
 
-            if entry_type != "file":
-                continue
 
-            download_url = entry.get("download_url")
-            if not isinstance(download_url, str) or not download_url:
-                continue
+def _download_repos(
+    repo_plans: list[_RepoPlan],
+    modules_root: Path,
+    executor: ThreadPoolExecutor,
+    known: _ModuleCache,
+    fetched: _ModuleCache,
+) -> int:
+    # Create each destination directory once rather than once per file.
+    for parent in {
+        destination_path.parent
+        for repo_plan in repo_plans
+        for module in repo_plan.modules
+        for _, destination_path in module.files.values()
+    }:
+        parent.mkdir(parents=True, exist_ok=True)
 
-            if root_prefix:
-                relative_part = (
-                    entry_path.removeprefix(root_prefix).lstrip("/")
-                    if entry_path.startswith(root_prefix)
-                    else Path(entry_path).name
+    download = partial(
+        _download_to_file,
+        modules_root=modules_root,
+        known=known,
+        fetched=fetched,
+    )
+    tarball_futures: list[tuple[_RepoPlan, Future[int]]] = []
+    file_futures: list[Future[None]] = []
+    for repo_plan in repo_plans:
+        if _use_tarball(repo_plan):
+            tarball_futures.append(
+                (
+                    repo_plan,
+                    executor.submit(
+                        _download_repo_tarball,
+                        repo_plan,
+                        modules_root,
+                        known,
+                        fetched,
+                    ),
                 )
-            else:
-                relative_part = entry_path
+            )
+            continue
+        for module in repo_plan.modules:
+            for url, destination_path in module.files.values():
+                file_futures.append(executor.submit(download, url, destination_path))
 
-            destination_path = module_destination / Path(relative_part)
-            destination_path.parent.mkdir(parents=True, exist_ok=True)
-            destination_path.write_bytes(_download_bytes(download_url))
-            file_count += 1
+    file_count = 0
+    for repo_plan, future in tarball_futures:
+        extracted = future.result()
+        if extracted == 0:
+            raise ValueError(
+                f"No files found in the {repo_plan.owner}/{repo_plan.repo} repository archive."
+            )
+        file_count += extracted
+    for future in file_futures:
+        future.result()
+    return file_count + len(file_futures)
 
-    if file_count == 0:
-        raise ValueError(f"No files found at GitHub path '{github_path}'.")
+
+def _remove_stale_files(modules_root: Path, expected_paths: set[Path]) -> None:
+    cache_dir = modules_root / _CACHE_DIR_NAME
+    for dir_path, _, file_names in os.walk(modules_root, topdown=False):
+        current_dir = Path(dir_path)
+        if current_dir == cache_dir or cache_dir in current_dir.parents:
+            continue
+        for file_name in file_names:
+            file_path = current_dir / file_name
+            if file_path not in expected_paths:
+                file_path.unlink()
+        if current_dir != modules_root and not any(current_dir.iterdir()):
+            current_dir.rmdir()
+
+
+def has_module_files(path_root: Path) -> bool:
+    """Return whether `<path_root>/.am` holds anything besides am's cache."""
+    try:
+        with os.scandir(path_root / ".am") as entries:
+            return any(entry.name != _CACHE_DIR_NAME for entry in entries)
+    except FileNotFoundError:
+        return False
+    except NotADirectoryError:
+        return True
+
+
+def download_github_module(github_path: str, destination_root: Path) -> int:
+    """Download all files at `github_path` into `<destination_root>/.am/...`."""
+    modules_root = destination_root / ".am"
+    known = _load_cache(modules_root)
+    # Entries for the path's other modules are carried over untouched.
+    fetched = _ModuleCache(etags=dict(known.etags), stamps=dict(known.stamps))
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        repo_plans = _plan_repos([github_path], destination_root, executor)
+        file_count = _download_repos(repo_plans, modules_root, executor, known, fetched)
+    _write_cache(modules_root, fetched)
     return file_count
 
 
@@ -122,15 +588,39 @@ def rebuild_modules_for_path(path_root: Path, github_paths: list[str]) -> int:
     """
     Rebuild `<path_root>/.am` from the provided module-enabled GitHub paths.
 
-    Existing `.am` content is removed first to keep generated modules in sync.
+    Files that are no longer part of any module are removed, and unchanged
+    files are skipped using the ETags recorded under `.am/.cache`.
     """
     modules_root = path_root / ".am"
-    if modules_root.is_dir():
-        shutil.rmtree(modules_root)
-    elif modules_root.exists():
+    if modules_root.exists() and not modules_root.is_dir():
         modules_root.unlink()
+    if not github_paths:
+        if modules_root.is_dir():
+            _remove_stale_files(modules_root, set())
+            _etags_path(modules_root).unlink(missing_ok=True)
+            for empty_dir in (modules_root / _CACHE_DIR_NAME, modules_root):
+                try:
+                    empty_dir.rmdir()
+                except OSError:
+                    break
+        return 0
 
-    downloaded_files = 0
-    for github_path in github_paths:
-        downloaded_files += download_github_module(github_path, path_root)
+    known = _load_cache(modules_root)
+    fetched = _ModuleCache(etags={}, stamps={})
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+        repo_plans = _plan_repos(github_paths, path_root, executor)
+        if modules_root.is_dir():
+            _remove_stale_files(
+                modules_root,
+                {
+                    destination_path
+                    for repo_plan in repo_plans
+                    for module in repo_plan.modules
+                    for _, destination_path in module.files.values()
+                },
+            )
+        downloaded_files = _download_repos(
+            repo_plans, modules_root, executor, known, fetched
+        )
+    _write_cache(modules_root, fetched)
     return downloaded_files
@@ -0,0 +1,53 @@
+"""Shared helpers for locating and normalizing project paths."""
+
+from __future__ import annotations
+
+import functools
+import os
+from pathlib import Path
+
+
+@functools.lru_cache(maxsize=32)
+def _find_project_root(start: str) -> str:
+    candidate = start
+    while True:
+        # One lstat per level. `.git` is a file rather than a directory in
+        # worktrees and submodules, so any entry type marks the root.
+        try:
+            os.lstat(os.path.join(candidate, ".git"))
+        except OSError:
+            pass
+        else:
+            return candidate
+        parent = os.path.dirname(candidate)
+        if parent == candidate:
+            return start
+        candidate = parent
+
+
+def find_project_root(start: Path) -> Path:
+    """Return the nearest ancestor of `start` containing `.git`, or `start` itself."""
+    return Path(_find_project_root(str(start)))
+
+
+def _is_within(path: str, root: str) -> bool:
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+def normalize_local_path(raw_path: str, project_root: Path) -> str:
+    """
+    Return `raw_path` as a POSIX path relative to the project root.
+
+    The key is normalized lexically, so symlinks are kept in it, but the
+    resolved target must also stay inside the project, as `am sync` checks.
+    """
+    root = os.path.normpath(str(project_root))
+    candidate = os.path.normpath(os.path.join(root, raw_path))
+    if not _is_within(candidate, root) or not _is_within(
+        os.path.realpath(candidate), os.path.realpath(root)
+    ):
+        raise ValueError(
+            f"Path '{raw_path}' must be within the project root '{project_root}'."
+        )
+
+    return os.path.relpath(candidate, root).replace(os.sep, "/")
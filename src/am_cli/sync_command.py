@@ -5,15 +5,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from . import module_helpers
-from .sync_helpers import load_mappings, refresh_agents_files
-
-
-def _find_project_root(start: Path) -> Path:
-    for candidate in [start, *start.parents]:
-        if (candidate / ".git").exists():
-            return candidate
-    return start
+from .path_helpers import find_project_root
 
 
 def register_sync_command(subparsers: argparse._SubParsersAction) -> None:
@@ -25,17 +17,21 @@ def register_sync_command(subparsers: argparse._SubParsersAction) -> None:
 
 
 def run_sync_command(args: argparse.Namespace) -> int:
+    from . import module_helpers
+    from .sync_helpers import compact_mappings, load_mappings, refresh_agents_files
+
     _ = args
-    project_root = _find_project_root(Path.cwd())
+    project_root = find_project_root(Path.cwd())
     config_path = project_root / "am.yml"
 
     try:
         mappings = load_mappings(config_path)
+        compact_mappings(config_path, mappings)
         refreshed_paths = refresh_agents_files(project_root=project_root, mappings=mappings)
         rebuilt_module_paths: list[tuple[Path, int]] = []
         project_root_resolved = project_root.resolve()
         for path_key, mds in mappings.items():
-            module_github_paths = [md_entry["name"] for md_entry in mds if md_entry["module"]]
+            module_github_paths = [md_entry.name for md_entry in mds if md_entry.module]
             target_dir = (project_root / path_key).resolve()
             try:
                 target_dir.relative_to(project_root_resolved)
@@ -45,8 +41,7 @@ def run_sync_command(args: argparse.Namespace) -> int:
                 ) from exc
 
             modules_root = target_dir / ".am"
-            had_modules_dir = modules_root.exists()
-            if not module_github_paths and not had_modules_dir:
+            if not module_github_paths and not module_helpers.has_module_files(target_dir):
                 continue
 
             downloaded_files = module_helpers.rebuild_modules_for_path(
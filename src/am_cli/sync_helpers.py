@@ -2,14 +2,25 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, BinaryIO, ContextManager, NamedTuple
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote
-from urllib.request import Request, urlopen
 
-import yaml
+if TYPE_CHECKING:
+    from http.client import HTTPResponse
+
+_MAX_FETCH_WORKERS = 16
+_MAX_REFRESH_WORKERS = 8
+_REMOTE_CACHE_INDEX = "remote.json"
+# Characters JSON leaves unescaped that YAML rejects or reads as line breaks.
+_YAML_UNSAFE_CHARS = re.compile("[\x7f-\x9f\u2028\u2029\ufffe\uffff]")
 
 ROOT_AGENTS_PREAMBLE = (
     "This project's AGENTS.md files are managed by am, which may pull in "
@@ -21,41 +32,83 @@ ROOT_AGENTS_PREAMBLE = (
     "For example, if a file called `foo.md` is referenced by the `bar` module, "
     "it will appear at `.am/bar/foo.md`."
 )
+# Documents are assembled as bytes, so keep an encoded copy of the preamble.
+_ROOT_AGENTS_PREAMBLE_BYTES = ROOT_AGENTS_PREAMBLE.encode("utf-8")
 
 
-class MdEntry(TypedDict):
+class MdEntry(NamedTuple):
     name: str
     module: bool
 
 
-def _parse_name(name_value: object, config_path: Path) -> str:
-    name = name_value
-    if not isinstance(name, str) or not name.strip():
-        raise ValueError(
-            f"Invalid `name` value in {config_path}: {name_value!r}. "
-            "Expected a non-empty string."
-        )
-    return name.strip()
+# PyYAML and http.client (which pulls in ssl) are imported on first use, so
+# commands that never parse am.yml or hit the network don't pay for them.
+@lru_cache(maxsize=None)
+def _yaml_loader() -> type:
+    import yaml
 
+    # CSafeLoader is only present when PyYAML was built with libyaml.
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def _parse_module(
-    module_value: object, config_path: Path, path_value: str, name_value: str
-) -> bool:
-    if module_value is None:
-        return False
-    if isinstance(module_value, bool):
-        return module_value
-    raise ValueError(
-        f"Invalid `module` value for path {path_value!r} and name {name_value!r} "
-        f"in {config_path}: {module_value!r}. Expected a boolean."
+
+def _open_url(url: str, headers: dict[str, str] | None = None) -> ContextManager[HTTPResponse]:
+    from .http_helpers import open_url
+
+    return open_url(url, headers=headers)
+
+
+def _open_github_api_url(url: str) -> ContextManager[HTTPResponse]:
+    from .http_helpers import GITHUB_API_HEADERS, open_url
+
+    return open_url(url, headers=GITHUB_API_HEADERS)
+
+
+# Parsed configs keyed by path, tagged with the (mtime_ns, size) they were read at.
+_MAPPINGS_CACHE: dict[str, tuple[tuple[int, int], dict[str, list[MdEntry]]]] = {}
+
+
+def _copy_mappings(
+    mappings: dict[str, list[MdEntry]],
+) -> dict[str, list[MdEntry]]:
+    # MdEntry is immutable, so copying the lists is enough.
+    return {path: list(mds) for path, mds in mappings.items()}
+
+
+def _cache_mappings(
+    config_path: Path, mappings: dict[str, list[MdEntry]], stat_result: os.stat_result
+) -> None:
+    _MAPPINGS_CACHE[str(config_path)] = (
+        (stat_result.st_mtime_ns, stat_result.st_size),
+        _copy_mappings(mappings),
     )
 
 
 def load_mappings(config_path: Path) -> dict[str, list[MdEntry]]:
-    if not config_path.exists():
-        raise ValueError(f"Missing config file: {config_path}. Run `am init` first.")
+    try:
+        config_file = config_path.open("rb")
+    except FileNotFoundError as exc:
+        raise ValueError(
+            f"Missing config file: {config_path}. Run `am init` first."
+        ) from exc
+
+    with config_file:
+        stat_result = os.fstat(config_file.fileno())
+        # Callers mutate the returned mappings, so the cache only hands out copies.
+        cached = _MAPPINGS_CACHE.get(str(config_path))
+        if cached is not None and cached[0] == (stat_result.st_mtime_ns, stat_result.st_size):
+            return _copy_mappings(cached[1])
+        mappings = _read_mappings(config_file, config_path)
+
+    _cache_mappings(config_path, mappings, stat_result)
+    return mappings
+
 
-    raw_data = yaml.safe_load(config_path.read_text(encoding="utf-8"))
+def _read_mappings(config_file: BinaryIO, config_path: Path) -> dict[str, list[MdEntry]]:
+    # libyaml reads the binary stream itself and decodes the UTF-8 in C.
+    # JSON configs are valid YAML too.
+    import yaml
+
+    raw_data = yaml.load(config_file, Loader=_yaml_loader())  # nosec B506
     if raw_data is None:
         return {}
     if not isinstance(raw_data, list):
@@ -63,7 +116,9 @@ def load_mappings(config_path: Path) -> dict[str, list[MdEntry]]:
             f"Invalid config in {config_path}. Expected a top-level YAML list."
         )
 
-    mappings: dict[str, list[MdEntry]] = {}
+    # md entries per path keyed by name, so repeated path blocks added by
+    # `append_mapping` merge with a dict lookup instead of a list scan.
+    parsed: dict[str, dict[str, MdEntry]] = {}
 
     for entry in raw_data:
         if not isinstance(entry, dict):
@@ -86,41 +141,131 @@ def load_mappings(config_path: Path) -> dict[str, list[MdEntry]]:
                 f"{mds_value!r}. Expected a list."
             )
 
-        parsed_mds: list[MdEntry] = []
+        parsed_mds = parsed.setdefault(path_value, {})
         for md_entry in mds_value:
             if not isinstance(md_entry, dict):
                 raise ValueError(
                     f"Invalid md entry for path {path_value!r} in {config_path}: "
                     f"{md_entry!r}. Expected a mapping with `name` and `module`."
                 )
-            name = _parse_name(md_entry.get("name"), config_path)
-            module = _parse_module(md_entry.get("module"), config_path, path_value, name)
-            parsed_mds.append({"name": name, "module": module})
 
-        mappings[path_value] = parsed_mds
+            name_value = md_entry.get("name")
+            if not isinstance(name_value, str) or not name_value.strip():
+                raise ValueError(
+                    f"Invalid `name` value in {config_path}: {name_value!r}. "
+                    "Expected a non-empty string."
+                )
+            name = name_value.strip()
 
-    return mappings
+            module = md_entry.get("module")
+            if module is None:
+                module = False
+            elif not isinstance(module, bool):
+                raise ValueError(
+                    f"Invalid `module` value for path {path_value!r} and name {name!r} "
+                    f"in {config_path}: {module!r}. Expected a boolean."
+                )
 
+            existing_md = parsed_mds.get(name)
+            if existing_md is None:
+                parsed_mds[name] = MdEntry(name, module)
+            elif module:
+                parsed_mds[name] = existing_md._replace(module=True)
 
-def write_mappings(config_path: Path, mappings: dict[str, list[MdEntry]]) -> None:
-    yaml_payload = [
-        {"path": path, "mds": mds}
-        for path, mds in mappings.items()
-    ]
-    rendered = yaml.safe_dump(
-        yaml_payload,
-        sort_keys=False,
-        default_flow_style=False,
-        allow_unicode=False,
-    )
-    config_path.write_text(rendered, encoding="utf-8")
+    return {path: list(mds_by_name.values()) for path, mds_by_name in parsed.items()}
+
+
+def _yaml_quote(value: str) -> str:
+    """Return `value` as a double-quoted YAML scalar."""
+    # ensure_ascii would write astral characters as surrogate-pair escapes,
+    # which libyaml rejects, so they are written as raw UTF-8 instead.
+    quoted = json.dumps(value, ensure_ascii=False)
+    return _YAML_UNSAFE_CHARS.sub(lambda match: f"\\u{ord(match.group()):04x}", quoted)
+
+
+def _render_path_block(path: str, mds: list[MdEntry]) -> list[str]:
+    lines = [f"- path: {_yaml_quote(path)}"]
+    if not mds:
+        lines.append("  mds: []")
+        return lines
+    lines.append("  mds:")
+    for md_entry in mds:
+        module = "true" if md_entry.module else "false"
+        lines.append(f"  - {{name: {_yaml_quote(md_entry.name)}, module: {module}}}")
+    return lines
 
 
+def _render_config_yaml(mappings: dict[str, list[MdEntry]]) -> str:
+    """
+    Render `mappings` as YAML for the fixed am.yml schema.
+
+    Strings are written JSON-style, which is valid double-quoted YAML.
+    """
+    if not mappings:
+        return "[]\n"
+
+    lines: list[str] = []
+    for path, mds in mappings.items():
+        lines.extend(_render_path_block(path, mds))
+    return "\n".join(lines) + "\n"
+
+
+def write_mappings(config_path: Path, mappings: dict[str, list[MdEntry]]) -> bool:
+    """Write `mappings` to `config_path`, returning False if it was already current."""
+    rendered = _render_config_yaml(mappings).encode("utf-8")
+    try:
+        if config_path.read_bytes() == rendered:
+            return False
+    except FileNotFoundError:
+        pass
+    config_path.write_bytes(rendered)
+    _cache_mappings(config_path, mappings, config_path.stat())
+    return True
+
+
+def _starts_with_block_sequence(config_file: BinaryIO) -> bool:
+    for line in config_file:
+        stripped = line.strip()
+        if not stripped or stripped.startswith(b"#") or stripped == b"---":
+            continue
+        return line.startswith(b"- ") or line.rstrip() == b"-"
+    return False
+
+
+def append_mapping(config_path: Path, path: str, md_entry: MdEntry) -> bool:
+    """
+    Append a single md entry for `path` to the end of `config_path`.
+
+    Returns False without writing when the config is not a block-style YAML list
+    that can be extended in place; callers should fall back to `write_mappings`.
+    """
+    block = "\n".join(_render_path_block(path, [md_entry])) + "\n"
+    with config_path.open("rb+") as config_file:
+        if not _starts_with_block_sequence(config_file):
+            return False
+        config_file.seek(-1, os.SEEK_END)
+        if config_file.read(1) != b"\n":
+            block = f"\n{block}"
+        config_file.write(block.encode("utf-8"))
+    return True
+
+
+def compact_mappings(config_path: Path, mappings: dict[str, list[MdEntry]]) -> bool:
+    """Rewrite `config_path` when appended entries left repeated path blocks."""
+    with config_path.open("rb") as config_file:
+        block_count = sum(1 for line in config_file if line.startswith(b"- path:"))
+    if block_count <= len(mappings):
+        return False
+    return write_mappings(config_path, mappings)
+
+
+# Several mapped slugs usually share a repository, so repo-level lookups are
+# memoized for the life of the process.
+@lru_cache(maxsize=256)
 def _get_github_default_branch(owner: str, repo: str) -> str:
     url = f"https://api.github.com/repos/{owner}/{repo}"
-    request = Request(url, headers={"User-Agent": "am-cli/0.1"})
     try:
-        with urlopen(request, timeout=20) as response:  # nosec B310
+        with _open_url(url) as response:
             data = json.loads(response.read().decode("utf-8"))
     except (HTTPError, URLError, TimeoutError) as exc:
         raise ValueError(
@@ -134,10 +279,50 @@ def _get_github_default_branch(owner: str, repo: str) -> str:
     return default_branch
 
 
-def _resolve_agents_relative_path(
-    owner: str, repo: str, default_branch: str, relative_path: list[str]
-) -> str:
-    base_path = "/".join(relative_path).strip("/")
+def _agents_lookup_key(directory: str) -> str:
+    return f"{directory}/agents.md" if directory else "agents.md"
+
+
+@lru_cache(maxsize=64)
+def _get_repo_tree(owner: str, repo: str, branch: str) -> dict[str, str] | None:
+    """
+    Map each directory's AGENTS.md (any filename case) to its path in the repo.
+
+    Returns None when GitHub truncated the tree, since a miss is then inconclusive.
+    """
+    url = (
+        f"https://api.github.com/repos/{owner}/{repo}/git/trees/"
+        f"{quote(branch, safe='')}?recursive=1"
+    )
+    try:
+        with _open_github_api_url(url) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+    except (HTTPError, URLError, TimeoutError, json.JSONDecodeError) as exc:
+        raise ValueError(
+            f"Failed to fetch the file tree for '{owner}/{repo}' at {url}. Error: {exc}"
+        ) from exc
+    if not isinstance(payload, dict) or not isinstance(payload.get("tree"), list):
+        raise ValueError(f"Unexpected GitHub tree response from {url}.")
+    if payload.get("truncated"):
+        return None
+
+    agents_paths: dict[str, str] = {}
+    for entry in payload["tree"]:
+        if not isinstance(entry, dict) or entry.get("type") != "blob":
+            continue
+        entry_path = entry.get("path")
+        if not isinstance(entry_path, str):
+            continue
+        directory, _, file_name = entry_path.rpartition("/")
+        if file_name.lower() == "agents.md":
+            # The tree is sorted like the contents API, so keep the first match.
+            agents_paths.setdefault(_agents_lookup_key(directory), entry_path)
+    return agents_paths
+
+
+def _list_agents_relative_path(
+    owner: str, repo: str, default_branch: str, base_path: str
+) -> str | None:
     encoded = quote(base_path, safe="/")
     if encoded:
         url = (
@@ -147,15 +332,8 @@ def _resolve_agents_relative_path(
     else:
         url = f"https://api.github.com/repos/{owner}/{repo}/contents?ref={default_branch}"
 
-    request = Request(
-        url,
-        headers={
-            "User-Agent": "am-cli/0.1",
-            "Accept": "application/vnd.github+json",
-        },
-    )
     try:
-        with urlopen(request, timeout=20) as response:  # nosec B310
+        with _open_github_api_url(url) as response:
             payload = json.loads(response.read().decode("utf-8"))
     except (HTTPError, URLError, TimeoutError, json.JSONDecodeError) as exc:
         raise ValueError(
@@ -177,6 +355,26 @@ def _resolve_agents_relative_path(
             and entry_path
         ):
             return entry_path
+    return None
+
+
+@lru_cache(maxsize=256)
+def _resolve_agents_relative_path(
+    owner: str, repo: str, default_branch: str, relative_path: tuple[str, ...]
+) -> str:
+    base_path = "/".join(relative_path)
+    agents_paths = _get_repo_tree(owner, repo, default_branch)
+    if agents_paths is None:
+        agents_path = _list_agents_relative_path(owner, repo, default_branch, base_path)
+    else:
+        agents_path = agents_paths.get(_agents_lookup_key(base_path))
+        if agents_path is None:
+            # The slug may name the AGENTS.md file itself.
+            parent_path = base_path.rpartition("/")[0]
+            if agents_paths.get(_agents_lookup_key(parent_path)) == base_path:
+                agents_path = base_path
+    if agents_path is not None:
+        return agents_path
 
     target_display = base_path or "."
     raise ValueError(
@@ -185,82 +383,259 @@ def _resolve_agents_relative_path(
     )
 
 
-def _github_agents_url(github_path: str) -> str:
-    cleaned = github_path.strip().rstrip("/")
-    slug_parts = [part for part in cleaned.split("/") if part]
+def _split_github_path(github_path: str) -> tuple[str, str, tuple[str, ...]]:
+    # Dropping empty parts also drops trailing and doubled slashes.
+    slug_parts = [part for part in github_path.strip().split("/") if part]
     if len(slug_parts) < 2:
         raise ValueError(
             f"Invalid GitHub path '{github_path}'. Expected at least <owner>/<repo>."
         )
+    owner, repo, *relative_path = slug_parts
+    return owner, repo, tuple(relative_path)
+
+
+def _prefetch_repo_lookups(owner_repo: tuple[str, str]) -> None:
+    owner, repo = owner_repo
+    _get_repo_tree(owner, repo, _get_github_default_branch(owner, repo))
 
-    owner, repo = slug_parts[0], slug_parts[1]
-    relative_path = slug_parts[2:]
+
+def _github_agents_url(github_path: str) -> str:
+    owner, repo, relative_path = _split_github_path(github_path)
     default_branch = _get_github_default_branch(owner, repo)
     agents_path = _resolve_agents_relative_path(
-        owner=owner,
-        repo=repo,
-        default_branch=default_branch,
-        relative_path=relative_path,
+        owner, repo, default_branch, relative_path
     )
     return f"https://raw.githubusercontent.com/{owner}/{repo}/refs/heads/{default_branch}/{agents_path}"
 
 
-def _fetch_remote_agents(github_path: str) -> str:
+class _RemoteCache(NamedTuple):
+    directory: Path
+    # ETags from the cache index, and the ones confirmed or refreshed this run.
+    known_etags: dict[str, str]
+    fetched_etags: dict[str, str]
+
+
+def _remote_cache_body_path(cache: _RemoteCache, url: str) -> Path:
+    return cache.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.md"
+
+
+def _load_remote_cache(cache_dir: Path) -> _RemoteCache:
+    try:
+        payload = json.loads((cache_dir / _REMOTE_CACHE_INDEX).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+    known_etags = {
+        url: etag
+        for url, etag in payload.items()
+        if isinstance(url, str) and isinstance(etag, str)
+    }
+    return _RemoteCache(directory=cache_dir, known_etags=known_etags, fetched_etags={})
+
+
+def _write_remote_cache(cache: _RemoteCache) -> None:
+    if not cache.fetched_etags and not cache.directory.is_dir():
+        return
+    cache.directory.mkdir(parents=True, exist_ok=True)
+    index_path = cache.directory / _REMOTE_CACHE_INDEX
+    # Replace the index atomically so concurrent runs never read a partial file.
+    temp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(
+        json.dumps(cache.fetched_etags, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+    os.replace(temp_path, index_path)
+
+    current_bodies = {
+        _remote_cache_body_path(cache, url).name for url in cache.fetched_etags
+    }
+    for body_path in cache.directory.glob("*.md"):
+        if body_path.name not in current_bodies:
+            body_path.unlink(missing_ok=True)
+
+
+def _fetch_remote_agents(github_path: str, cache: _RemoteCache | None = None) -> bytes:
     url = _github_agents_url(github_path)
-    request = Request(url, headers={"User-Agent": "am-cli/0.1"})
+    headers: dict[str, str] = {}
+    if cache is not None:
+        known_etag = cache.known_etags.get(url)
+        if known_etag and _remote_cache_body_path(cache, url).is_file():
+            headers["If-None-Match"] = known_etag
+
     try:
-        with urlopen(request, timeout=20) as response:  # nosec B310
-            return response.read().decode("utf-8")
+        with _open_url(url, headers=headers) as response:
+            if response.status == 304 and cache is not None and headers:
+                cache.fetched_etags[url] = headers["If-None-Match"]
+                return _remote_cache_body_path(cache, url).read_bytes()
+            body = response.read()
+            etag = response.getheader("ETag")
     except (HTTPError, URLError, TimeoutError) as exc:
         raise ValueError(
             f"Failed to fetch AGENTS.md for '{github_path}' at {url}. Error: {exc}"
         ) from exc
 
-
-def compose_agents_document(mds: list[MdEntry], local_agents_path: Path) -> str:
-    sections: list[str] = []
+    if cache is not None and etag:
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        _remote_cache_body_path(cache, url).write_bytes(body)
+        cache.fetched_etags[url] = etag
+    return body
+
+
+def _fetch_all_remote_agents(
+    github_paths: list[str], cache_dir: Path | None = None
+) -> dict[str, bytes]:
+    """
+    Fetch each distinct remote AGENTS.md concurrently, keyed by GitHub path.
+
+    With `cache_dir`, bodies are cached there and revalidated with ETags.
+    """
+    unique_paths = list(dict.fromkeys(github_paths))
+    cache = _load_remote_cache(cache_dir) if cache_dir is not None else None
+
+    remote_contents: dict[str, bytes] = {}
+    if unique_paths:
+        with ThreadPoolExecutor(
+            max_workers=min(_MAX_FETCH_WORKERS, len(unique_paths))
+        ) as executor:
+            # lru_cache doesn't merge concurrent misses, so resolve each
+            # repository's branch and tree once before the per-slug fan-out.
+            repos: dict[tuple[str, str], None] = {}
+            for github_path in unique_paths:
+                try:
+                    owner, repo, _ = _split_github_path(github_path)
+                except ValueError:
+                    continue  # Reported by the per-slug fetch below.
+                repos[(owner, repo)] = None
+            list(executor.map(_prefetch_repo_lookups, repos))
+
+            fetch = partial(_fetch_remote_agents, cache=cache)
+            remote_contents = dict(zip(unique_paths, executor.map(fetch, unique_paths)))
+
+    if cache is not None:
+        _write_remote_cache(cache)
+    return remote_contents
+
+
+def _strip_document(content: bytes) -> bytes:
+    """Strip `content` as `str.strip()` would, raising if it isn't valid UTF-8."""
+    stripped = content.strip()
+    # Decoding checks the whole body; bytes.strip() only trims ASCII whitespace,
+    # so re-encode in the rare case of Unicode whitespace at either end.
+    text = stripped.decode("utf-8")
+    unicode_stripped = text.strip()
+    if len(unicode_stripped) == len(text):
+        return stripped
+    return unicode_stripped.encode("utf-8")
+
+
+def compose_agents_document(
+    mds: list[MdEntry],
+    local_agents_path: Path,
+    remote_contents: dict[str, bytes] | None = None,
+) -> bytes:
+    if remote_contents is None:
+        remote_contents = _fetch_all_remote_agents([md_entry.name for md_entry in mds])
+
+    # Bodies stay as the UTF-8 bytes they were fetched or read as.
+    sections: list[bytes] = []
     for md_entry in mds:
-        github_path = md_entry["name"]
-        remote_content = _fetch_remote_agents(github_path).strip()
+        github_path = md_entry.name
+        remote_content = _strip_document(remote_contents[github_path])
         if remote_content:
-            sections.append(f"# am start {github_path}.\n\n{remote_content}")
+            header = b"# am start %s.\n\n" % github_path.encode("utf-8")
+            sections.append(header + remote_content)
 
-    if local_agents_path.exists():
-        local_content = local_agents_path.read_text(encoding="utf-8").strip()
-        if local_content:
-            sections.append(f"# am local\n\n{local_content}")
+    try:
+        local_content = _strip_document(local_agents_path.read_bytes())
+    except FileNotFoundError:
+        local_content = b""
+    if local_content:
+        sections.append(b"# am local\n\n" + local_content)
 
     if not sections:
-        return ""
-    return "\n\n".join(sections) + "\n"
+        return b""
+    return b"\n\n".join(sections) + b"\n"
+
+
+def _write_if_changed(path: Path, content: bytes) -> None:
+    """Write `content` to `path` unless the file already holds exactly those bytes."""
+    try:
+        # A size mismatch settles it without reading the existing file.
+        if os.stat(path).st_size == len(content) and path.read_bytes() == content:
+            return
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+
+
+def _refresh_agents_file(
+    target_dir: Path,
+    mds: list[MdEntry],
+    remote_contents: dict[str, bytes],
+    project_root_resolved: Path,
+) -> Path:
+    agents_content = compose_agents_document(
+        mds=mds,
+        local_agents_path=target_dir / "AGENTS.local.md",
+        remote_contents=remote_contents,
+    )
+    if target_dir == project_root_resolved:
+        if agents_content:
+            agents_content = _ROOT_AGENTS_PREAMBLE_BYTES + b"\n" + agents_content
+        else:
+            agents_content = _ROOT_AGENTS_PREAMBLE_BYTES
+    agents_path = target_dir / "AGENTS.md"
+    # Leave unchanged files alone so no-op syncs don't bump mtimes and
+    # wake up file watchers.
+    _write_if_changed(agents_path, agents_content)
+    return agents_path
 
 
 def refresh_agents_files(
     project_root: Path, mappings: dict[str, list[MdEntry]]
 ) -> list[Path]:
-    refreshed_paths: list[Path] = []
-
+    # resolve() hits the filesystem for every path component, so do it once.
+    project_root_resolved = project_root.resolve()
+    # Keys such as `sub` and `./sub` can resolve to the same directory. Only the
+    # last one's document is kept, and each AGENTS.md has a single writer.
+    target_dirs: dict[Path, list[MdEntry]] = {}
     for path_key, mds in mappings.items():
         target_dir = (project_root / path_key).resolve()
         try:
-            target_dir.relative_to(project_root.resolve())
+            target_dir.relative_to(project_root_resolved)
         except ValueError as exc:
             raise ValueError(
                 f"Configured path '{path_key}' must be within project root '{project_root}'."
             ) from exc
+        target_dirs[target_dir] = mds
 
-        target_dir.mkdir(parents=True, exist_ok=True)
-        agents_content = compose_agents_document(
-            mds=mds,
-            local_agents_path=target_dir / "AGENTS.local.md",
-        )
-        if target_dir == project_root.resolve():
-            if agents_content:
-                agents_content = f"{ROOT_AGENTS_PREAMBLE}\n{agents_content}"
-            else:
-                agents_content = ROOT_AGENTS_PREAMBLE
-        agents_path = target_dir / "AGENTS.md"
-        agents_path.write_text(agents_content, encoding="utf-8")
-        refreshed_paths.append(agents_path)
-
-    return refreshed_paths
+    # Fetch remote documents for every path in one pool so a slow fetch for one
+    # path doesn't hold up the others.
+    remote_contents = _fetch_all_remote_agents(
+        [md_entry.name for mds in target_dirs.values() for md_entry in mds],
+        cache_dir=project_root / ".am" / ".cache",
+    )
+
+    if not target_dirs:
+        return []
+    # Create each distinct directory once, shallowest first so every mkdir
+    # finds its parent in place. The project root already exists.
+    for target_dir in sorted(target_dirs, key=lambda path: len(path.parts)):
+        if target_dir != project_root_resolved:
+            target_dir.mkdir(parents=True, exist_ok=True)
+
+    refresh = partial(
+        _refresh_agents_file,
+        remote_contents=remote_contents,
+        project_root_resolved=project_root_resolved,
+    )
+    # Each path writes its own AGENTS.md. Results are collected in mapping order
+    # so callers print them deterministically.
+    with ThreadPoolExecutor(
+        max_workers=min(_MAX_REFRESH_WORKERS, len(target_dirs))
+    ) as executor:
+        futures = [
+            executor.submit(refresh, target_dir, mds)
+            for target_dir, mds in target_dirs.items()
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,262 @@
+"""Tests for conditional module downloads in `am_cli.module_helpers`."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import tarfile
+import tempfile
+import unittest
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+from am_cli import module_helpers
+
+_SMALL_BLOB = 10
+# Large enough that the repository is never fetched as a tarball.
+_LARGE_BLOB = 64 * 1024 * 1024
+
+
+class _Response(io.BytesIO):
+    def __init__(self, status: int, body: bytes, etag: str) -> None:
+        super().__init__(body)
+        self.status = status
+        self._etag = etag
+
+    def getheader(self, name: str, default: str | None = None) -> str | None:
+        return self._etag if name == "ETag" else default
+
+
+class _BrokenResponse(_Response):
+    """A response whose connection drops partway through the body."""
+
+    def read(self, size: int | None = -1) -> bytes:
+        if self.tell() >= len(self.getbuffer()) // 2:
+            raise ConnectionResetError("connection reset by peer")
+        return super().read(max(1, len(self.getbuffer()) // 4))
+
+
+class _FakeGitHub:
+    """Serves one `o/r` repository's tree, raw files and tarball, with ETags."""
+
+    def __init__(self, files: dict[str, bytes], blob_size: int) -> None:
+        self.files = dict(files)
+        self.blob_size = blob_size
+        self.requests: list[tuple[int, str]] = []
+        # URLs ending in one of these suffixes fail partway through a 200 body.
+        self.broken: set[str] = set()
+
+    def _tarball(self) -> bytes:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for path, data in sorted(self.files.items()):
+                member = tarfile.TarInfo(f"o-r-abc123/{path}")
+                member.size = len(data)
+                archive.addfile(member, io.BytesIO(data))
+        return buffer.getvalue()
+
+    def _resource(self, url: str) -> tuple[bytes, str]:
+        if "/git/trees/" in url:
+            tree = [
+                {"type": "blob", "path": path, "size": self.blob_size}
+                for path in self.files
+            ]
+            return json.dumps({"truncated": False, "tree": tree}).encode(), ""
+        if "/tarball/" in url:
+            version = json.dumps(sorted(self.files.items()), default=bytes.hex).encode()
+            return self._tarball(), f'"{hashlib.sha1(version).hexdigest()}"'
+        body = self.files[url.split("/o/r/main/", 1)[1]]
+        return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+    @contextmanager
+    def open_url(
+        self, url: str, headers: dict[str, str] | None = None, timeout: float = 20
+    ) -> Iterator[_Response]:
+        body, etag = self._resource(url)
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            self.requests.append((304, url))
+            yield _Response(304, b"", etag)
+            return
+        self.requests.append((200, url))
+        if any(url.endswith(suffix) for suffix in self.broken):
+            yield _BrokenResponse(200, body, etag)
+            return
+        yield _Response(200, body, etag)
+
+    def downloads(self) -> list[tuple[int, str]]:
+        return [(status, url) for status, url in self.requests if "/git/trees/" not in url]
+
+
+class ConditionalDownloadTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.modules_root = self.root / ".am"
+
+    def _github(self, files: dict[str, bytes], blob_size: int) -> _FakeGitHub:
+        github = _FakeGitHub(files, blob_size)
+        patcher = mock.patch.object(module_helpers, "open_url", github.open_url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return github
+
+    def _read(self, relative_path: str) -> bytes:
+        return (self.modules_root / relative_path).read_bytes()
+
+    def test_unchanged_files_are_revalidated_instead_of_downloaded(self) -> None:
+        github = self._github({"mod/a.md": b"A1", "mod/b.md": b"B1"}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        github.requests.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual({status for status, _ in github.downloads()}, {304})
+        self.assertEqual(self._read("o_r_mod/a.md"), b"A1")
+
+    def test_changed_and_missing_files_are_downloaded_again(self) -> None:
+        github = self._github({"mod/a.md": b"A1", "mod/b.md": b"B1"}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        github.files["mod/a.md"] = b"A2"
+        (self.modules_root / "o_r_mod" / "b.md").unlink()
+        github.requests.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual({status for status, _ in github.downloads()}, {200})
+        self.assertEqual(self._read("o_r_mod/a.md"), b"A2")
+        self.assertEqual(self._read("o_r_mod/b.md"), b"B1")
+
+    def test_unchanged_tarball_is_revalidated(self) -> None:
+        github = self._github({"mod/a.md": b"A1", "mod/b.md": b"B1"}, _SMALL_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        github.requests.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual(
+            github.downloads(), [(304, "https://api.github.com/repos/o/r/tarball/main")]
+        )
+
+    def test_adding_a_module_does_not_hide_updates_to_a_sibling_from_its_tarball(
+        self,
+    ) -> None:
+        github = self._github(
+            {"mod1/a.md": b"A1", "mod1/b.md": b"B1", "mod2/c.md": b"C1", "mod2/d.md": b"D1"},
+            _SMALL_BLOB,
+        )
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod2"])
+        github.files["mod2/c.md"] = b"C2"
+
+        module_helpers.download_github_module("o/r/mod1", self.root)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod1", "o/r/mod2"])
+
+        self.assertEqual(self._read("o_r_mod2/c.md"), b"C2")
+        self.assertEqual(self._read("o_r_mod1/a.md"), b"A1")
+
+    def test_overlapping_modules_track_their_own_copies_of_a_file(self) -> None:
+        github = self._github(
+            {"skills/x/a.md": b"A1", "skills/y.md": b"Y1"}, _LARGE_BLOB
+        )
+        modules = ["o/r/skills", "o/r/skills/x"]
+        module_helpers.rebuild_modules_for_path(self.root, modules)
+        github.files["skills/x/a.md"] = b"A2"
+
+        module_helpers.download_github_module("o/r/skills/x", self.root)
+        module_helpers.rebuild_modules_for_path(self.root, modules)
+
+        self.assertEqual(self._read("o_r_skills/x/a.md"), b"A2")
+        self.assertEqual(self._read("o_r_skills_x/a.md"), b"A2")
+
+    def test_interrupted_download_keeps_the_previous_file(self) -> None:
+        github = self._github({"mod/a.md": b"A1", "mod/b.md": b"B1"}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        github.files["mod/b.md"] = b"B2" * 50
+        github.broken.add("/mod/b.md")
+
+        with self.assertRaisesRegex(ValueError, "Failed to download file"):
+            module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual(self._read("o_r_mod/b.md"), b"B1")
+        module_files = sorted(path.name for path in (self.modules_root / "o_r_mod").iterdir())
+        self.assertEqual(module_files, ["a.md", "b.md"])
+
+    def test_interrupted_tarball_is_reported_as_a_download_failure(self) -> None:
+        github = self._github({"mod/a.md": b"A" * 4096, "mod/b.md": b"B1"}, _SMALL_BLOB)
+        github.broken.add("/tarball/main")
+
+        with self.assertRaisesRegex(ValueError, "Failed to download archive"):
+            module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+    def test_truncated_or_edited_files_are_downloaded_again(self) -> None:
+        github = self._github({"mod/a.md": b"A" * 100, "mod/b.md": b"B" * 100}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        (self.modules_root / "o_r_mod" / "a.md").write_bytes(b"edited")
+        (self.modules_root / "o_r_mod" / "b.md").write_bytes(b"B" * 30)
+        github.requests.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual({status for status, _ in github.downloads()}, {200})
+        self.assertEqual(self._read("o_r_mod/a.md"), b"A" * 100)
+        self.assertEqual(self._read("o_r_mod/b.md"), b"B" * 100)
+
+    def test_file_is_restored_after_an_interrupted_download(self) -> None:
+        github = self._github({"mod/a.md": b"A" * 100, "mod/b.md": b"B" * 100}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        (self.modules_root / "o_r_mod" / "b.md").unlink()
+        github.broken.add("/mod/b.md")
+        with self.assertRaises(ValueError):
+            module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        github.broken.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual(self._read("o_r_mod/b.md"), b"B" * 100)
+
+    def test_edited_file_invalidates_its_tarball(self) -> None:
+        github = self._github({"mod/a.md": b"A1", "mod/b.md": b"B1"}, _SMALL_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+        (self.modules_root / "o_r_mod" / "a.md").write_bytes(b"edited")
+        github.requests.clear()
+
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual(
+            github.downloads(), [(200, "https://api.github.com/repos/o/r/tarball/main")]
+        )
+        self.assertEqual(self._read("o_r_mod/a.md"), b"A1")
+
+    def test_cache_stores_etags_by_url_and_destination_with_file_stamps(self) -> None:
+        self._github({"mod/a.md": b"A1"}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        stored = json.loads((self.modules_root / ".cache" / "module-etags.json").read_text())
+
+        stat_result = (self.modules_root / "o_r_mod" / "a.md").stat()
+        self.assertEqual(
+            stored,
+            {
+                "etags": {
+                    "https://raw.githubusercontent.com/o/r/main/mod/a.md": {
+                        "o_r_mod/a.md": f'"{hashlib.sha1(b"A1").hexdigest()}"'
+                    }
+                },
+                "files": {"o_r_mod/a.md": [stat_result.st_size, stat_result.st_mtime_ns]},
+            },
+        )
+
+    def test_rebuilding_without_modules_removes_the_modules_tree(self) -> None:
+        self._github({"mod/a.md": b"A1"}, _LARGE_BLOB)
+        module_helpers.rebuild_modules_for_path(self.root, ["o/r/mod"])
+
+        self.assertEqual(module_helpers.rebuild_modules_for_path(self.root, []), 0)
+
+        self.assertFalse(self.modules_root.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
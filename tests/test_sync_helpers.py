@@ -0,0 +1,129 @@
+"""Tests for reading and writing am.yml in `am_cli.sync_helpers`."""
+
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from am_cli import sync_helpers
+from am_cli.sync_helpers import (
+    MdEntry,
+    append_mapping,
+    compact_mappings,
+    compose_agents_document,
+    load_mappings,
+    write_mappings,
+)
+
+
+class MappingsFileTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.config_path = Path(temp_dir.name) / "am.yml"
+        self.addCleanup(sync_helpers._MAPPINGS_CACHE.clear)
+
+    def _load_uncached(self) -> dict[str, list[MdEntry]]:
+        sync_helpers._MAPPINGS_CACHE.clear()
+        return load_mappings(self.config_path)
+
+    def test_written_mappings_round_trip(self) -> None:
+        mappings = {
+            ".": [MdEntry("o/r", False)],
+            "docs/café \U0001f600\x85": [MdEntry('o/r/"quoted"', True)],
+            "empty": [],
+        }
+
+        self.assertTrue(write_mappings(self.config_path, mappings))
+
+        self.assertEqual(self._load_uncached(), mappings)
+        self.assertIn("\U0001f600", self.config_path.read_text(encoding="utf-8"))
+        self.assertFalse(write_mappings(self.config_path, mappings))
+
+    def test_appended_path_blocks_merge_on_load(self) -> None:
+        write_mappings(self.config_path, {".": [MdEntry("o/r", False)]})
+
+        self.assertTrue(append_mapping(self.config_path, ".", MdEntry("o/r2", False)))
+        self.assertTrue(append_mapping(self.config_path, "sub", MdEntry("o/r3", False)))
+        self.assertTrue(append_mapping(self.config_path, ".", MdEntry("o/r", True)))
+
+        self.assertEqual(
+            load_mappings(self.config_path),
+            {
+                ".": [MdEntry("o/r", True), MdEntry("o/r2", False)],
+                "sub": [MdEntry("o/r3", False)],
+            },
+        )
+        self.assertEqual(self.config_path.read_text().count("- path: \".\""), 3)
+
+    def test_append_adds_missing_trailing_newline(self) -> None:
+        self.config_path.write_text('- path: "."\n  mds: []')
+
+        self.assertTrue(append_mapping(self.config_path, ".", MdEntry("o/r", False)))
+
+        self.assertEqual(self._load_uncached(), {".": [MdEntry("o/r", False)]})
+
+    def test_append_refuses_configs_that_are_not_block_lists(self) -> None:
+        for content in ("[]\n", '[{"path": ".", "mds": []}]\n', ""):
+            with self.subTest(content=content):
+                self.config_path.write_text(content)
+
+                self.assertFalse(append_mapping(self.config_path, ".", MdEntry("o/r", False)))
+
+                self.assertEqual(self.config_path.read_text(), content)
+
+    def test_append_skips_leading_comments_and_document_marker(self) -> None:
+        self.config_path.write_text('# mappings\n---\n- path: "."\n  mds: []\n')
+
+        self.assertTrue(append_mapping(self.config_path, ".", MdEntry("o/r", False)))
+
+        self.assertEqual(self._load_uncached(), {".": [MdEntry("o/r", False)]})
+
+    def test_compact_rewrites_only_repeated_path_blocks(self) -> None:
+        write_mappings(self.config_path, {".": [MdEntry("o/r", False)]})
+        self.assertFalse(compact_mappings(self.config_path, load_mappings(self.config_path)))
+
+        append_mapping(self.config_path, ".", MdEntry("o/r2", False))
+        mappings = load_mappings(self.config_path)
+
+        self.assertTrue(compact_mappings(self.config_path, mappings))
+        self.assertEqual(self.config_path.read_text().count("- path:"), 1)
+        self.assertEqual(self._load_uncached(), mappings)
+
+
+class ComposeAgentsDocumentTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.local_path = Path(temp_dir.name) / "AGENTS.local.md"
+
+    def test_sections_are_stripped_of_unicode_whitespace(self) -> None:
+        self.local_path.write_bytes("\u3000 local rules\u00a0\n".encode("utf-8"))
+
+        document = compose_agents_document(
+            [MdEntry("o/r", False)],
+            self.local_path,
+            remote_contents={"o/r": "\n remote café\u00a0\n\n".encode("utf-8")},
+        )
+
+        self.assertEqual(
+            document.decode("utf-8"),
+            "# am start o/r.\n\nremote café\n\n# am local\n\nlocal rules\n",
+        )
+
+    def test_bodies_that_are_not_utf8_are_rejected(self) -> None:
+        with self.assertRaises(UnicodeDecodeError):
+            compose_agents_document(
+                [MdEntry("o/r", False)],
+                self.local_path,
+                remote_contents={"o/r": b"caf\xe9\n"},
+            )
+
+        self.local_path.write_bytes(b"caf\xe9\n")
+        with self.assertRaises(UnicodeDecodeError):
+            compose_agents_document([], self.local_path, remote_contents={})
+
+
+if __name__ == "__main__":
+    unittest.main()